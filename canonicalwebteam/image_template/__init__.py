@@ -1,4 +1,5 @@
 # Standard library
+import json
 import os
 import sys
 from urllib.parse import quote, unquote, urlparse
@@ -26,6 +27,7 @@ def image_template(
     sizes="(min-width: {}px) {}px, 100vw",
     srcset_widths=None,
     hi_def=False,
+    source_widths=None,
 ):
     """
     Generate responsive image markup with optimized srcset and sizes.
@@ -44,6 +46,9 @@ def image_template(
         sizes: Responsive sizes attribute template
         srcset_widths: Custom widths for srcset generation
         hi_def: Enable high-DPI support (up to 2x)
+        source_widths: Mapping of image URLs to their intrinsic widths,
+            used to avoid requesting upscaled images (defaults to the
+            manifest loaded with image_template.load_source_widths)
     """
 
     url_parts = urlparse(url)
@@ -82,9 +87,25 @@ def image_template(
     if fill:
         cloudinary_options.append("c_fill")
 
+    # Never request raster images wider than the source image, as
+    # upscaled images cost bytes with no gain in quality
+    width_int = int(width)
+    source_width = None
+    if source_widths is None:
+        source_widths = image_template.default_source_widths
+    if source_widths and generate_srcset:
+        source_width = source_widths.get(url) or source_widths.get(
+            unquote(url)
+        )
+
     # Create main image source
     std_def_cloudinary_options = cloudinary_options.copy()
-    std_def_cloudinary_options.append(f"w_{width}")
+    if source_width:
+        std_def_cloudinary_options.append(
+            f"w_{min(width_int, int(source_width))}"
+        )
+    else:
+        std_def_cloudinary_options.append(f"w_{width}")
     std_def_cloudinary_attrs = ",".join(std_def_cloudinary_options)
 
     # Decode the URL first to prevent double encoding
@@ -103,9 +124,6 @@ def image_template(
             # https://vanillaframework.io/docs/settings/breakpoint-settings
             srcset_widths = [460, 620, 1036, 1681, 1920]
 
-        width_int = int(width)
-        srcset = []
-
         def create_srcset_url(width, options):
             width_options = options.copy()
             width_options.append(f"w_{width}")
@@ -117,9 +135,8 @@ def image_template(
 
         # Handle small images (≤460px) - generate 2x for high-DPI displays
         if width_int <= 460:
-            srcset.append(create_srcset_url(width_int, cloudinary_options))
             # Add 2x version for high-DPI displays to prevent pixelation
-            srcset.append(create_srcset_url(width_int * 2, cloudinary_options))
+            candidate_widths = [width_int, width_int * 2]
         else:
             # Handle larger images with standard responsive widths
             max_srcset_width = max(srcset_widths)
@@ -129,23 +146,29 @@ def image_template(
                 max_width_limit = min(width_int, max_srcset_width)
 
             # Generate srcset entries for standard widths
-            filtered_widths = [
+            candidate_widths = [
                 w for w in srcset_widths if w <= max_width_limit
             ]
-            srcset.extend(
-                create_srcset_url(w, cloudinary_options)
-                for w in filtered_widths
-            )
 
             # Add original width if needed
-            existing_widths = {int(w) for w in filtered_widths}
+            existing_widths = {int(w) for w in candidate_widths}
             if (
                 width_int <= max_width_limit
                 and width_int not in existing_widths
             ):
-                srcset.append(create_srcset_url(width_int, cloudinary_options))
+                candidate_widths.append(width_int)
+
+        # Clamp candidates to the source width, dropping duplicates
+        if source_width:
+            candidate_widths = list(
+                dict.fromkeys(
+                    min(int(w), int(source_width)) for w in candidate_widths
+                )
+            )
 
-        image_srcset = ", ".join(srcset)
+        image_srcset = ", ".join(
+            create_srcset_url(w, cloudinary_options) for w in candidate_widths
+        )
 
     # Format sizes attribute
     try:
@@ -179,4 +202,27 @@ def image_template(
         raise ValueError("output_mode must be 'html' or 'attrs'")
 
 
+def load_source_widths(path):
+    """
+    Load a JSON manifest mapping image URLs to their intrinsic widths,
+    used by every image_template() call not given source_widths
+    """
+
+    with open(path) as manifest_file:
+        image_template.default_source_widths = json.load(manifest_file)
+
+    return image_template.default_source_widths
+
+
+image_template.default_source_widths = {}
+image_template.load_source_widths = load_source_widths
+
+# Keep submodules (e.g. canonicalwebteam.image_template.warmup) importable
+# once this module has been replaced by the image_template function
+image_template.__path__ = __path__
+image_template.__spec__ = __spec__
+
+# Shared with submodules that need to recognise generated URLs
+image_template.cloudinary_url_base = cloudinary_url_base
+
 sys.modules[__name__] = image_template
@@ -0,0 +1,183 @@
+# Standard library
+import functools
+import inspect
+
+# Packages
+from django import template
+from django.conf import settings
+from django.template.base import token_kwargs
+from django.utils.functional import Promise
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+# Local
+from canonicalwebteam import image_template
+
+register = template.Library()
+
+parameters = inspect.signature(image_template).parameters
+parameter_names = list(parameters)
+required_names = [
+    name
+    for name, parameter in parameters.items()
+    if parameter.default is parameter.empty
+]
+
+# Names Django resolves from the builtins of every context
+literal_lookups = {("True",), ("False",), ("None",)}
+
+
+def _is_literal(expression):
+    """
+    Whether a FilterExpression resolves to the same value in any context
+    """
+
+    if expression.filters:
+        return False
+
+    if expression.is_var:
+        variable = expression.var
+        return not variable.translate and (
+            variable.lookups is None or variable.lookups in literal_lookups
+        )
+
+    # Translated strings depend on the active language
+    return not isinstance(expression.var, Promise)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_source_widths(path):
+    return image_template.load_source_widths(path)
+
+
+def _render(kwargs):
+    output = image_template(**kwargs)
+
+    if isinstance(output, str):
+        output = mark_safe(output)
+
+    return output
+
+
+class ImageNode(template.Node):
+    """
+    Render image_template() markup, computing it once when the template
+    is parsed if every argument is a literal
+    """
+
+    def __init__(self, kwargs, dynamic_kwargs, target_var=None):
+        self.kwargs = kwargs
+        self.dynamic_kwargs = dynamic_kwargs
+        self.target_var = target_var
+        self.output = None
+
+        if not dynamic_kwargs:
+            try:
+                self.output = _render(kwargs)
+            except Exception as error:
+                raise template.TemplateSyntaxError(
+                    f"image tag: {error}"
+                ) from error
+
+    def render(self, context):
+        output = self.output
+
+        if output is None:
+            kwargs = self.kwargs.copy()
+            for name, expression in self.dynamic_kwargs.items():
+                kwargs[name] = expression.resolve(context)
+            output = _render(kwargs)
+        elif isinstance(output, dict):
+            # Don't share the precomputed attributes between renders
+            output = dict(output)
+
+        if self.target_var:
+            context[self.target_var] = output
+            return ""
+
+        # e.g. attributes from a dynamic output_mode, as simple_tag does
+        if not isinstance(output, str):
+            output = str(output)
+            if context.autoescape:
+                output = conditional_escape(output)
+
+        return output
+
+
+@register.tag
+def image(parser, token):
+    """
+    {% image url="..." alt="..." width="..." [as variable] %}
+
+    Takes the same arguments as image_template()
+    """
+
+    # Load the manifest before markup is precomputed for literal tags
+    source_widths_path = getattr(
+        settings, "IMAGE_TEMPLATE_SOURCE_WIDTHS", None
+    )
+    if source_widths_path:
+        _load_source_widths(source_widths_path)
+
+    bits = token.split_contents()
+    tag_name = bits.pop(0)
+
+    target_var = None
+    if len(bits) >= 2 and bits[-2] == "as":
+        target_var = bits[-1]
+        bits = bits[:-2]
+
+    kwargs = {}
+    dynamic_kwargs = {}
+    keyword_seen = False
+
+    for position, bit in enumerate(bits):
+        kwarg = token_kwargs([bit], parser)
+
+        if kwarg:
+            ((name, expression),) = kwarg.items()
+            keyword_seen = True
+        elif keyword_seen:
+            raise template.TemplateSyntaxError(
+                f"'{tag_name}' positional argument follows keyword argument"
+            )
+        elif position >= len(parameter_names):
+            raise template.TemplateSyntaxError(
+                f"'{tag_name}' received too many positional arguments"
+            )
+        else:
+            name = parameter_names[position]
+            expression = parser.compile_filter(bit)
+
+        if name not in parameter_names:
+            raise template.TemplateSyntaxError(
+                f"'{tag_name}' received unexpected keyword argument '{name}'"
+            )
+        if name in kwargs or name in dynamic_kwargs:
+            raise template.TemplateSyntaxError(
+                f"'{tag_name}' received multiple values for '{name}'"
+            )
+
+        if _is_literal(expression):
+            kwargs[name] = expression.resolve(template.Context())
+        else:
+            dynamic_kwargs[name] = expression
+
+    missing_names = [
+        name
+        for name in required_names
+        if name not in kwargs and name not in dynamic_kwargs
+    ]
+    if missing_names:
+        raise template.TemplateSyntaxError(
+            f"'{tag_name}' did not receive value(s) for the argument(s): "
+            + ", ".join(f"'{name}'" for name in missing_names)
+        )
+
+    if kwargs.get("output_mode") == "attrs" and not target_var:
+        raise template.TemplateSyntaxError(
+            f"'{tag_name}' with output_mode=\"attrs\" must store its "
+            "result with 'as <variable>'"
+        )
+
+    return ImageNode(kwargs, dynamic_kwargs, target_var)
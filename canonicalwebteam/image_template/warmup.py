@@ -0,0 +1,456 @@
+# Standard library
+import argparse
+import glob
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+# Packages
+from jinja2 import Environment, nodes
+from jinja2.exceptions import TemplateSyntaxError
+
+# Local
+from canonicalwebteam import image_template
+
+cloudinary_url_base = image_template.cloudinary_url_base
+
+# Positional parameter order of image_template()
+parameter_names = list(inspect.signature(image_template).parameters)
+function_names = ["image", "image_template"]
+
+django_tag_pattern = re.compile(r"{%\s*image\s+(.*?)\s*%}", re.DOTALL)
+django_bit_pattern = re.compile(r"""(?:[^\s"']|"[^"]*"|'[^']*')+""")
+django_kwarg_pattern = re.compile(r"^(?:(\w+)=)?(.+)$")
+django_string_pattern = re.compile(r"""^(?:"[^"]*"|'[^']*')$""")
+django_literals = {"True": True, "False": False, "None": None}
+jinja_call_pattern = re.compile(r"\b(?:image|image_template)\s*\(")
+
+
+def _parse_django_value(value):
+    """
+    Turn a literal Django template argument into a Python value,
+    or raise ValueError if it is a variable
+    """
+
+    if django_string_pattern.match(value):
+        return value[1:-1]
+    if value in django_literals:
+        return django_literals[value]
+    if value.isdigit():
+        return int(value)
+
+    raise ValueError(f"{value} is not a literal")
+
+
+def _parse_django_arguments(tag_arguments):
+    """
+    Map the bits of an `{% image %}` tag onto image_template() arguments,
+    or raise ValueError if they can't all be known before rendering
+    """
+
+    bits = django_bit_pattern.findall(tag_arguments)
+
+    # `as <variable>` only changes where the output goes
+    if len(bits) >= 2 and bits[-2] == "as":
+        bits = bits[:-2]
+
+    arguments = {}
+
+    for position, bit in enumerate(bits):
+        name, value = django_kwarg_pattern.match(bit).groups()
+
+        if name is None:
+            if len(arguments) != position:
+                raise ValueError("positional argument follows keyword")
+            if position >= len(parameter_names):
+                raise ValueError("too many positional arguments")
+            name = parameter_names[position]
+
+        if name in arguments:
+            raise ValueError(f"multiple values for {name}")
+
+        arguments[name] = _parse_django_value(value)
+
+    return arguments
+
+
+def _django_calls(source):
+    for match in django_tag_pattern.finditer(source):
+        try:
+            yield _parse_django_arguments(match.group(1))
+        except ValueError:
+            # Dynamic arguments can only be known at render time
+            continue
+
+
+def _jinja_calls(tree):
+    for call in tree.find_all(nodes.Call):
+        if not (
+            isinstance(call.node, nodes.Name)
+            and call.node.name in function_names
+        ):
+            continue
+
+        # *args and **kwargs can only be known at render time
+        if call.dyn_args or call.dyn_kwargs:
+            continue
+
+        try:
+            arguments = dict(
+                zip(parameter_names, [arg.as_const() for arg in call.args])
+            )
+            arguments.update(
+                {kwarg.key: kwarg.value.as_const() for kwarg in call.kwargs}
+            )
+        except nodes.Impossible:
+            # Dynamic arguments can only be known at render time
+            continue
+
+        yield arguments
+
+
+def discover_calls(
+    template_paths=(), manifest_path=None, jinja_extensions=(), unparsed=None
+):
+    """
+    Find the literal arguments of every image_template() invocation.
+
+    Templates may use either the Jinja `image(...)` function or the
+    Django `{% image ... %}` tag; calls with dynamic arguments are skipped.
+    Jinja templates are parsed with `jinja_extensions` loaded, and files
+    that look like they call image() but can't be parsed are recorded as
+    (filename, error) in the `unparsed` list if one is given.
+    A manifest is a JSON lines file with one object of image_template()
+    keyword arguments per line.
+    """
+
+    calls = []
+    jinja_environment = Environment(extensions=list(jinja_extensions))
+
+    for template_path in template_paths:
+        if os.path.isdir(template_path):
+            filenames = sorted(
+                glob.glob(
+                    os.path.join(template_path, "**", "*.html"),
+                    recursive=True,
+                )
+            )
+        else:
+            filenames = [template_path]
+
+        for filename in filenames:
+            with open(filename) as template_file:
+                source = template_file.read()
+
+            try:
+                tree = jinja_environment.parse(source)
+            except TemplateSyntaxError as error:
+                # Django templates aren't valid Jinja, but a failure in
+                # a file with image() calls means those calls are missed
+                if unparsed is not None and jinja_call_pattern.search(source):
+                    unparsed.append((filename, str(error)))
+            else:
+                calls.extend(_jinja_calls(tree))
+
+            calls.extend(_django_calls(source))
+
+    if manifest_path:
+        with open(manifest_path) as manifest_file:
+            calls.extend(
+                json.loads(line) for line in manifest_file if line.strip()
+            )
+
+    return calls
+
+
+def expand_urls(calls, base_url=None, source_widths=None, skipped=None):
+    """
+    Expand image_template() arguments into the deduplicated list of
+    every `src` and `srcset` URL they generate, in order of first use.
+    Optionally swap the Cloudinary URL base for `base_url`, and pass
+    `source_widths` on to image_template() so URLs match clamped markup.
+
+    Calls that image_template() rejects are skipped, and recorded as
+    (arguments, error) in the `skipped` list if one is given.
+    """
+
+    urls = {}
+
+    for call in calls:
+        arguments = {**call, "output_mode": "attrs"}
+        if source_widths:
+            arguments.setdefault("source_widths", source_widths)
+
+        try:
+            image_attrs = image_template(**arguments)
+        except Exception as error:
+            if skipped is not None:
+                skipped.append((call, str(error)))
+            continue
+
+        urls[image_attrs["src"]] = None
+
+        if image_attrs.get("srcset"):
+            for candidate in image_attrs["srcset"].split(", "):
+                urls[candidate.rsplit(" ", 1)[0]] = None
+
+    if base_url:
+        base_url = base_url.rstrip("/")
+        return [
+            base_url + url[len(cloudinary_url_base) :]  # noqa: E203
+            for url in urls
+        ]
+
+    return list(urls)
+
+
+class _RateLimiter:
+    """
+    Space out requests so no more than `rate` start per second
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            start_time = max(now, self.next_time)
+            self.next_time = start_time + self.interval
+
+        if start_time > now:
+            time.sleep(start_time - now)
+
+
+def _percentile(sorted_values, percent):
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+
+    if not sorted_values:
+        return None
+
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def warm_urls(urls, concurrency=8, rate=None, timeout=30):
+    """
+    Request every URL concurrently, reusing one keep-alive connection per
+    host in each worker thread, with at most `rate` requests per second.
+
+    Returns a report with the number of requests, latency percentiles
+    in seconds for requests that got a response and a list of
+    (url, error) failures.
+    """
+
+    limiter = _RateLimiter(rate)
+    local = threading.local()
+
+    def get_connection(scheme, netloc):
+        if not hasattr(local, "connections"):
+            local.connections = {}
+            local.reused = set()
+
+        key = (scheme, netloc)
+        if key not in local.connections:
+            connection_class = (
+                HTTPSConnection if scheme == "https" else HTTPConnection
+            )
+            local.connections[key] = connection_class(netloc, timeout=timeout)
+
+        return key, local.connections[key]
+
+    def close_connection(key):
+        local.connections.pop(key).close()
+        local.reused.discard(key)
+
+    def fetch(url):
+        url_parts = urlsplit(url)
+        path = url_parts.path
+        if url_parts.query:
+            path += "?" + url_parts.query
+
+        limiter.wait()
+
+        while True:
+            key, connection = get_connection(
+                url_parts.scheme, url_parts.netloc
+            )
+            reused = key in local.reused
+            start = time.monotonic()
+
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+            except ConnectionError as error:
+                close_connection(key)
+                # The server may have closed an idle kept-alive connection,
+                # so try once more on a new one
+                if reused:
+                    continue
+                return url, None, str(error)
+            except Exception as error:
+                close_connection(key)
+                return url, None, str(error)
+
+            break
+
+        try:
+            # Read the whole body so the connection can be reused
+            response.read()
+        except Exception as error:
+            close_connection(key)
+            return url, None, str(error)
+
+        latency = time.monotonic() - start
+        local.reused.add(key)
+
+        if response.status >= 400:
+            return url, latency, f"HTTP {response.status}"
+
+        return url, latency, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, urls))
+
+    latencies = sorted(
+        latency for _, latency, _ in results if latency is not None
+    )
+
+    return {
+        "requests": len(results),
+        "latency": {
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+        "failures": [(url, error) for url, _, error in results if error],
+    }
+
+
+def _positive(number_type):
+    """
+    Argparse type for numbers greater than zero
+    """
+
+    def parse(value):
+        try:
+            number = number_type(value)
+        except ValueError:
+            number = None
+
+        if number is None or number <= 0:
+            raise argparse.ArgumentTypeError(
+                f"must be a positive number, got {value!r}"
+            )
+
+        return number
+
+    return parse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Pre-request every image URL generated by image_template() "
+            "calls, to warm the CDN cache after a release."
+        )
+    )
+    parser.add_argument(
+        "templates",
+        nargs="*",
+        help="Template files or directories to search for image calls",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="JSON lines file of recorded image_template() arguments",
+    )
+    parser.add_argument(
+        "--jinja-extension",
+        action="append",
+        default=[],
+        dest="jinja_extensions",
+        help="Jinja extension to parse templates with (e.g. jinja2.ext.i18n)",
+    )
+    parser.add_argument(
+        "--base-url",
+        help=f"Request URLs from this base instead of {cloudinary_url_base}",
+    )
+    parser.add_argument(
+        "--source-widths",
+        help="JSON file mapping image URLs to their intrinsic widths",
+    )
+    parser.add_argument("--concurrency", type=_positive(int), default=8)
+    parser.add_argument(
+        "--rate", type=_positive(float), help="Maximum requests per second"
+    )
+    parser.add_argument("--timeout", type=_positive(float), default=30)
+    args = parser.parse_args(argv)
+
+    unparsed = []
+    calls = discover_calls(
+        args.templates,
+        args.manifest,
+        jinja_extensions=args.jinja_extensions,
+        unparsed=unparsed,
+    )
+
+    for filename, error in unparsed:
+        print(f"Could not parse: {filename} ({error})", file=sys.stderr)
+
+    source_widths = None
+    if args.source_widths:
+        with open(args.source_widths) as source_widths_file:
+            source_widths = json.load(source_widths_file)
+
+    skipped = []
+    urls = expand_urls(
+        calls,
+        base_url=args.base_url,
+        source_widths=source_widths,
+        skipped=skipped,
+    )
+
+    for call, error in skipped:
+        print(f"Skipped: {json.dumps(call)} ({error})", file=sys.stderr)
+
+    print(f"Found {len(calls)} image calls, {len(urls)} unique URLs")
+
+    report = warm_urls(
+        urls,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        timeout=args.timeout,
+    )
+
+    for name, latency in report["latency"].items():
+        if latency is not None:
+            print(f"{name}: {latency * 1000:.0f}ms")
+
+    for url, error in report["failures"]:
+        print(f"Failed: {url} ({error})", file=sys.stderr)
+
+    print(
+        f"{report['requests'] - len(report['failures'])}/"
+        f"{report['requests']} succeeded"
+    )
+
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
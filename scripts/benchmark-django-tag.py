@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+
+"""
+Compare render times of the packaged `{% image %}` Django tag with the
+`simple_tag` approach previously suggested in the README, using the
+cached template loader as Django does in production.
+"""
+
+# Standard library
+import timeit
+
+# Packages
+import django
+from django import template
+from django.conf import settings
+from django.template import Context, Engine
+from django.utils.safestring import mark_safe
+
+# Local
+from canonicalwebteam import image_template
+import canonicalwebteam.image_template.templatetags as templatetags
+
+settings.configure()
+django.setup()
+
+readme_library = template.Library()
+
+
+@readme_library.simple_tag
+def image(*args, **kwargs):
+    return mark_safe(image_template(*args, **kwargs))
+
+
+image_tags = "\n".join(
+    (
+        '{% image url="https://assets.ubuntu.com/v1/'
+        f'{index}-hero.png" alt="Hero {index}" width="{width}" '
+        'height="585" hi_def=True fill=True %}'
+    )
+    for index, width in enumerate([320, 540, 1040, 1920] * 5)
+)
+dynamic_image_tag = (
+    '{% image url=hero_url alt="Hero" width="1040" hi_def=True %}'
+)
+templates = {
+    "literal.html": image_tags,
+    "dynamic.html": dynamic_image_tag,
+}
+
+
+def create_engine(library):
+    cached_loader = (
+        "django.template.loaders.cached.Loader",
+        [("django.template.loaders.locmem.Loader", templates)],
+    )
+    engine = Engine(loaders=[cached_loader])
+    engine.template_builtins.append(library)
+
+    return engine
+
+
+engines = {
+    "README simple_tag": create_engine(readme_library),
+    "templatetags": create_engine(templatetags.register),
+}
+context = {"hero_url": "https://assets.ubuntu.com/v1/hero.png"}
+
+for template_name in templates:
+    print(f"{template_name}:")
+    outputs = set()
+
+    for engine_name, engine in engines.items():
+        page = engine.get_template(template_name)
+        outputs.add(page.render(Context(context)))
+
+        number = 200
+        seconds = min(
+            timeit.repeat(
+                lambda: page.render(Context(context)),
+                number=number,
+                repeat=5,
+            )
+        )
+        print(f"  {engine_name}: {seconds / number * 1e6:.1f}µs per render")
+
+    assert len(outputs) == 1, "Both tags should render identical markup"
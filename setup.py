@@ -5,7 +5,7 @@ from setuptools import setup
 
 setup(
     name="canonicalwebteam.image-template",
-    version="1.9.0",
+    version="1.12.0",
     author="Canonical webteam",
     author_email="webteam@canonical.com",
     url=(
@@ -18,5 +18,7 @@ setup(
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
     install_requires=["jinja2>=2"],
+    extras_require={"django": ["django"]},
+    tests_require=["django"],
     test_suite="tests",
 )
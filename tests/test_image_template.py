@@ -1,4 +1,6 @@
 # Standard library
+import json
+import tempfile
 import unittest
 
 # Local
@@ -362,6 +364,97 @@ class TestImageTemplate(unittest.TestCase):
         self.assertIn("e_sharpen", attrs_result["src"])
         self.assertIn("f_svg", attrs_result["src"])
 
+    def test_source_widths_clamp_srcset(self):
+        attrs_result = image_template(
+            url=non_asset_url,
+            alt="test",
+            width="1920",
+            hi_def=True,
+            source_widths={non_asset_url: 1000},
+            output_mode="attrs",
+        )
+
+        # The main image is never wider than the source
+        self.assertIn("w_1000/", attrs_result["src"])
+        self.assertEqual(attrs_result["width"], 1920)
+
+        # Candidates above the source width collapse into one
+        srcset_widths = [
+            candidate.rsplit(" ", 1)[1]
+            for candidate in attrs_result["srcset"].split(", ")
+        ]
+        self.assertEqual(srcset_widths, ["460w", "620w", "1000w"])
+        self.assertNotIn("w_1036", attrs_result["srcset"])
+
+    def test_source_widths_clamp_small_images(self):
+        attrs_result = image_template(
+            url="https://example.com/image.jpg",
+            alt="Test Image",
+            width="50",
+            source_widths={"https://example.com/image.jpg": 80},
+            output_mode="attrs",
+        )
+
+        self.assertIn("w_50/", attrs_result["src"])
+        self.assertIn("80w", attrs_result["srcset"])
+        self.assertNotIn("100w", attrs_result["srcset"])
+
+        attrs_result = image_template(
+            url="https://example.com/image.jpg",
+            alt="Test Image",
+            width="50",
+            source_widths={"https://example.com/image.jpg": 40},
+            output_mode="attrs",
+        )
+
+        self.assertIn("w_40/", attrs_result["src"])
+        self.assertEqual(attrs_result["srcset"].count(" 40w"), 1)
+        self.assertNotIn(", ", attrs_result["srcset"])
+
+    def test_source_widths_unknown_url(self):
+        markup = image_template(
+            url=non_asset_url, alt="test", width="1080", height="1080"
+        )
+        clamped_markup = image_template(
+            url=non_asset_url,
+            alt="test",
+            width="1080",
+            height="1080",
+            source_widths={asset_url: 200},
+        )
+
+        self.assertEqual(markup, clamped_markup)
+
+    def test_load_source_widths_default(self):
+        self.addCleanup(setattr, image_template, "default_source_widths", {})
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as manifest:
+            json.dump({non_asset_url: 1000}, manifest)
+            manifest.flush()
+
+            source_widths = image_template.load_source_widths(manifest.name)
+
+        self.assertEqual(source_widths, {non_asset_url: 1000})
+
+        attrs_result = image_template(
+            url=non_asset_url,
+            alt="test",
+            width="1920",
+            output_mode="attrs",
+        )
+        self.assertIn("w_1000/", attrs_result["src"])
+        self.assertNotIn("w_1036", attrs_result["srcset"])
+
+        # Explicit source_widths take precedence over the loaded manifest
+        attrs_result = image_template(
+            url=non_asset_url,
+            alt="test",
+            width="1920",
+            source_widths={},
+            output_mode="attrs",
+        )
+        self.assertIn("w_1920/", attrs_result["src"])
+
 
 if __name__ == "__main__":
     unittest.main()
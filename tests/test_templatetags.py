@@ -0,0 +1,143 @@
+# Standard library
+import json
+import tempfile
+import unittest
+
+# Packages
+import django
+from django.conf import settings
+from django.template import Context, Engine, TemplateSyntaxError
+from django.test import override_settings
+from django.utils.safestring import SafeString
+
+# Local
+from canonicalwebteam import image_template
+import canonicalwebteam.image_template.templatetags as templatetags
+
+if not settings.configured:
+    settings.configure()
+    django.setup()
+
+image_url = "https://assets.ubuntu.com/v1/9f6916dd-k8s-prometheus-light.png"
+
+engine = Engine(
+    builtins=["canonicalwebteam.image_template.templatetags"],
+)
+
+
+class TestImageTag(unittest.TestCase):
+    def test_literal_arguments_precomputed(self):
+        template = engine.from_string(
+            f'{{% image url="{image_url}" alt="Dashboard" width="1040" '
+            'height="585" hi_def=True fill=True %}'
+        )
+        expected = image_template(
+            url=image_url,
+            alt="Dashboard",
+            width="1040",
+            height="585",
+            hi_def=True,
+            fill=True,
+        )
+
+        node = template.nodelist[0]
+        self.assertIsInstance(node, templatetags.ImageNode)
+        self.assertIsInstance(node.output, SafeString)
+        self.assertEqual(node.output, expected)
+        self.assertEqual(template.render(Context()), expected)
+
+    def test_source_widths_setting_clamps_precomputed_markup(self):
+        self.addCleanup(setattr, image_template, "default_source_widths", {})
+        self.addCleanup(templatetags._load_source_widths.cache_clear)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as manifest:
+            json.dump({image_url: 1000}, manifest)
+            manifest.flush()
+
+            with override_settings(IMAGE_TEMPLATE_SOURCE_WIDTHS=manifest.name):
+                template = engine.from_string(
+                    f'{{% image url="{image_url}" alt="" width="1920" '
+                    "hi_def=True %}"
+                )
+
+        node = template.nodelist[0]
+        self.assertIsInstance(node.output, SafeString)
+        self.assertIn("w_1000/", node.output)
+        self.assertIn("1000w", node.output)
+        self.assertNotIn("w_1036", node.output)
+        self.assertEqual(template.render(Context()), node.output)
+
+    def test_dynamic_arguments_resolved_at_render(self):
+        template = engine.from_string(
+            f'{{% image "{image_url}" alt width=600 %}}'
+        )
+
+        node = template.nodelist[0]
+        self.assertIsNone(node.output)
+        self.assertEqual(node.kwargs, {"url": image_url, "width": 600})
+        self.assertEqual(list(node.dynamic_kwargs), ["alt"])
+
+        for alt in ["first", "second"]:
+            self.assertEqual(
+                template.render(Context({"alt": alt})),
+                image_template(url=image_url, alt=alt, width=600),
+            )
+
+    def test_as_variable(self):
+        template = engine.from_string(
+            f'{{% image url="{image_url}" alt="" width=600 '
+            'output_mode="attrs" as hero %}{{ hero.src }}|{{ hero.width }}'
+        )
+        image_attrs = image_template(
+            url=image_url, alt="", width=600, output_mode="attrs"
+        )
+
+        self.assertEqual(
+            template.render(Context()),
+            f"{image_attrs['src']}|600",
+        )
+
+    def test_as_variable_not_shared_between_renders(self):
+        template = engine.from_string(
+            f'{{% image url="{image_url}" alt="" width=600 '
+            'output_mode="attrs" as hero %}'
+        )
+        first_context = Context()
+        second_context = Context()
+
+        template.render(first_context)
+        first_context["hero"]["class"] = "changed"
+        template.render(second_context)
+
+        self.assertIsNot(first_context["hero"], second_context["hero"])
+        self.assertNotIn("class", second_context["hero"])
+
+    def test_dynamic_attrs_output_without_variable(self):
+        template = engine.from_string(
+            f'{{% image url="{image_url}" alt="" width=600 '
+            "output_mode=mode %}"
+        )
+
+        output = template.render(Context({"mode": "attrs"}))
+
+        self.assertIn("&#x27;src&#x27;: ", output)
+
+    def test_invalid_arguments(self):
+        invalid_tags = [
+            '{% image url="/no-hostname.png" alt="" width=600 %}',
+            '{% image url="' + image_url + '" "" 600 %}',
+            '{% image url="' + image_url + '" alt="" width=600 size=1 %}',
+            '{% image url="' + image_url + '" url="" alt="" width=600 %}',
+            '{% image url=page.url alt="" %}',
+            '{% image url="' + image_url + '" alt="" width=600 '
+            'output_mode="attrs" %}',
+        ]
+
+        for invalid_tag in invalid_tags:
+            with self.subTest(tag=invalid_tag):
+                with self.assertRaises(TemplateSyntaxError):
+                    engine.from_string(invalid_tag)
+
+
+if __name__ == "__main__":
+    unittest.main()
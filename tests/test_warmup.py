@@ -0,0 +1,265 @@
+# Standard library
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local
+from canonicalwebteam import image_template
+import canonicalwebteam.image_template.warmup as warmup
+
+image_url = "https://assets.ubuntu.com/v1/479958ed-vivid-hero-takeover.jpg"
+svg_url = "https://assets.ubuntu.com/v1/450d7c2f-openstack-hero.svg"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        status = 404 if "missing" in self.path else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class ClosingHandler(StandInHandler):
+    """
+    Drops every connection after responding, as an idle keep-alive
+    connection timing out would
+    """
+
+    paths = []
+
+    def do_GET(self):
+        super().do_GET()
+        self.close_connection = True
+
+
+class TestWarmup(unittest.TestCase):
+    def start_server(self, handler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        return f"http://127.0.0.1:{server.server_port}"
+
+    def test_discover_jinja_and_django_calls(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "jinja.html"), "w") as f:
+                f.write(
+                    "{{ image(url='" + image_url + "', alt='', width=600,"
+                    " hi_def=True, attrs={'class': 'hero'}) | safe }}"
+                    "{{ image(url=dynamic_url, alt='', width=600) | safe }}"
+                )
+            with open(os.path.join(directory, "django.html"), "w") as f:
+                f.write(
+                    '{% image url="' + svg_url + '" alt="" width="200" %}'
+                    "{% image url=page.url alt='' width=200 %}"
+                )
+
+            calls = warmup.discover_calls([directory])
+
+        self.assertEqual(
+            calls,
+            [
+                {"url": svg_url, "alt": "", "width": "200"},
+                {
+                    "url": image_url,
+                    "alt": "",
+                    "width": 600,
+                    "hi_def": True,
+                    "attrs": {"class": "hero"},
+                },
+            ],
+        )
+
+    def test_discover_positional_and_dynamic_calls(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "jinja.html"), "w") as f:
+                f.write(
+                    "{{ image('" + image_url + "', '', 600) | safe }}"
+                    "{{ image(**hero) | safe }}"
+                    "{{ image('" + image_url + "', *rest) | safe }}"
+                )
+            with open(os.path.join(directory, "django.html"), "w") as f:
+                f.write(
+                    '{% image "' + svg_url + '" alt="" width=600 as hero %}'
+                    '{% image alt="" "' + svg_url + '" width=600 %}'
+                    '{% image "' + svg_url + '"|upper alt="" width=600 %}'
+                )
+
+            calls = warmup.discover_calls([directory])
+
+        self.assertEqual(
+            calls,
+            [
+                {"url": svg_url, "alt": "", "width": 600},
+                {"url": image_url, "alt": "", "width": 600},
+            ],
+        )
+
+    def test_discover_jinja_extensions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "trans.html"), "w") as f:
+                f.write(
+                    "{{ image(url='" + image_url + "', alt='', width=600) }}"
+                    "{% trans %}Hero{% endtrans %}"
+                )
+            with open(os.path.join(directory, "django.html"), "w") as f:
+                f.write("{% load i18n %}{% trans 'Hero' %}")
+
+            unparsed = []
+            calls = warmup.discover_calls([directory], unparsed=unparsed)
+
+            self.assertEqual(calls, [])
+            self.assertEqual(
+                [filename for filename, _ in unparsed],
+                [os.path.join(directory, "trans.html")],
+            )
+
+            unparsed = []
+            calls = warmup.discover_calls(
+                [directory],
+                jinja_extensions=["jinja2.ext.i18n"],
+                unparsed=unparsed,
+            )
+
+        self.assertEqual(calls, [{"url": image_url, "alt": "", "width": 600}])
+        self.assertEqual(unparsed, [])
+
+    def test_discover_manifest(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as manifest:
+            manifest.write(
+                json.dumps({"url": image_url, "alt": "", "width": 50})
+            )
+            manifest.write("\n\n")
+            manifest.flush()
+
+            calls = warmup.discover_calls(manifest_path=manifest.name)
+
+        self.assertEqual(calls, [{"url": image_url, "alt": "", "width": 50}])
+
+    def test_expand_urls_matches_image_template(self):
+        call = {"url": image_url, "alt": "", "width": "1000", "hi_def": True}
+        image_attrs = image_template(**call, output_mode="attrs")
+
+        urls = warmup.expand_urls([call, call])
+
+        self.assertEqual(urls[0], image_attrs["src"])
+        self.assertEqual(
+            urls[1:],
+            [
+                candidate.rsplit(" ", 1)[0]
+                for candidate in image_attrs["srcset"].split(", ")
+                if not candidate.startswith(image_attrs["src"] + " ")
+            ],
+        )
+        self.assertEqual(len(urls), len(set(urls)))
+
+    def test_expand_urls_skips_invalid_calls(self):
+        skipped = []
+        urls = warmup.expand_urls(
+            [
+                {"url": "/relative.png", "alt": "", "width": 200},
+                {"alt": "", "width": 200},
+                {"url": svg_url, "alt": "", "width": 200},
+            ],
+            skipped=skipped,
+        )
+
+        self.assertEqual(len(urls), 1)
+        self.assertEqual(
+            [call for call, _ in skipped],
+            [
+                {"url": "/relative.png", "alt": "", "width": 200},
+                {"alt": "", "width": 200},
+            ],
+        )
+        self.assertEqual(skipped[0][1], "url must contain a hostname")
+
+    def test_expand_urls_base_url(self):
+        urls = warmup.expand_urls(
+            [{"url": svg_url, "alt": "", "width": 200}],
+            base_url="http://localhost:8000/",
+        )
+
+        self.assertEqual(len(urls), 1)
+        self.assertTrue(
+            urls[0].startswith("http://localhost:8000/f_svg,q_auto")
+        )
+
+    def test_warm_urls_against_stand_in_server(self):
+        base_url = self.start_server(StandInHandler)
+        urls = warmup.expand_urls(
+            [{"url": image_url, "alt": "", "width": 1920, "hi_def": True}],
+            base_url=base_url,
+        )
+        urls.append(base_url + "/missing.png")
+
+        report = warmup.warm_urls(urls, concurrency=2, rate=1000)
+
+        self.assertEqual(report["requests"], len(urls))
+        self.assertEqual(len(StandInHandler.paths), len(urls))
+        self.assertEqual(
+            report["failures"], [(base_url + "/missing.png", "HTTP 404")]
+        )
+        self.assertLessEqual(
+            report["latency"]["p50"], report["latency"]["max"]
+        )
+
+    def test_warm_urls_retries_closed_connections(self):
+        base_url = self.start_server(ClosingHandler)
+        urls = [f"{base_url}/{index}.png" for index in range(3)]
+
+        report = warmup.warm_urls(urls, concurrency=1)
+
+        self.assertEqual(report["failures"], [])
+        self.assertEqual(ClosingHandler.paths, ["/0.png", "/1.png", "/2.png"])
+
+    def test_warm_urls_latency_excludes_connection_errors(self):
+        base_url = self.start_server(StandInHandler)
+
+        # Nothing listens on port 1, so the connection is refused
+        report = warmup.warm_urls(
+            [f"{base_url}/found.png", "http://127.0.0.1:1/refused.png"]
+        )
+
+        self.assertEqual(len(report["failures"]), 1)
+        self.assertEqual(report["latency"]["p50"], report["latency"]["max"])
+
+        report = warmup.warm_urls(["http://127.0.0.1:1/refused.png"])
+
+        self.assertEqual(len(report["failures"]), 1)
+        self.assertIsNone(report["latency"]["p50"])
+
+    def test_main_rejects_non_positive_options(self):
+        for option in [
+            ["--concurrency", "0"],
+            ["--concurrency", "-2"],
+            ["--rate", "0"],
+            ["--rate", "-1.5"],
+            ["--rate", "fast"],
+        ]:
+            with self.subTest(option=option):
+                with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                    with self.assertRaises(SystemExit) as context:
+                        warmup.main(option)
+
+                self.assertEqual(context.exception.code, 2)
+                self.assertIn("must be a positive number", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()